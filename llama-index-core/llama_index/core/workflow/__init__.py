@@ -21,6 +21,7 @@ from llama_index.core.workflow.context import Context
 from llama_index.core.workflow.context_serializers import (
     JsonPickleSerializer,
     JsonSerializer,
+    PickleSerializer,
 )
 from llama_index.core.workflow.checkpointer import (
     Checkpoint,
@@ -44,6 +45,7 @@ __all__ = [
     "HumanResponseEvent",
     "JsonPickleSerializer",
     "JsonSerializer",
+    "PickleSerializer",
     "WorkflowCheckpointer",
     "Checkpoint",
 ]
@@ -1,21 +1,24 @@
 import asyncio
+import copy
 import functools
-import json
 import time
 import warnings
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     DefaultDict,
+    Deque,
     Dict,
+    FrozenSet,
     List,
     Optional,
     Set,
     Tuple,
     Type,
     TypeVar,
+    Union,
 )
 
 from llama_index.core.instrumentation.dispatcher import Dispatcher
@@ -37,7 +40,7 @@ if TYPE_CHECKING:  # pragma: no cover
     from .workflow import Workflow
 
 T = TypeVar("T", bound=Event)
-EventBuffer = Dict[str, List[Event]]
+EventBuffer = Dict[str, Deque[Event]]
 
 
 # Only warn once about unserializable keys
@@ -47,6 +50,41 @@ class UnserializableKeyWarning(Warning):
 
 warnings.simplefilter("once", UnserializableKeyWarning)
 
+# JsonSerializer holds no state, so a single instance can be shared by all the contexts
+_DEFAULT_SERIALIZER = JsonSerializer()
+
+DEFAULT_BROKER_LOG_SIZE = 10_000
+
+# Version of the payload produced by `Context.to_dict`. Payloads without a version were
+# produced before event lists were serialized with `serialize_many`.
+CONTEXT_PAYLOAD_VERSION = 2
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_full_path(ev_type: Type[Event]) -> str:
+    return f"{ev_type.__module__}.{ev_type.__name__}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_expected_counts(
+    expected: Tuple[Type[Event], ...],
+) -> Tuple[Tuple[str, int], ...]:
+    """Returns how many instances of each event type are expected, types can repeat."""
+    return tuple(Counter(_get_full_path(e_type) for e_type in expected).items())
+
+
+def _bulk_put(queue: asyncio.Queue, items: List[Any]) -> None:
+    """
+    Put all the items into a new, unbounded queue nobody is waiting on yet.
+
+    This extends the underlying deque directly and replicates the bookkeeping of
+    `put_nowait`, which is much faster than putting items one by one. Wakeups are
+    skipped since a queue that was just created has no getters.
+    """
+    queue._queue.extend(items)  # type: ignore
+    queue._unfinished_tasks += len(items)  # type: ignore
+    queue._finished.clear()  # type: ignore
+
 
 class Context:
     """
@@ -57,79 +95,132 @@ class Context:
     Every context instance offers two type of data storage: a global one, that's shared among all the steps within a
     workflow, and private one, that's only accessible from a single step.
 
-    Both `set` and `get` operations on global data are governed by a lock, and considered coroutine-safe.
+    Both `set` and `get` operations on global data are coroutine-safe: `set` is governed by a lock, while `get`
+    reads the underlying dict directly since lookups can't be interleaved by other coroutines.
+
+    Every event sent is also recorded in a broker log. Only the last `broker_log_size` events are kept, pass
+    `None` to keep them all or `0` to disable the log entirely. When not provided, the `broker_log_size` of the
+    workflow is used.
     """
 
     # These keys are set by pre-built workflows and
     # are known to be unserializable in some cases.
     known_unserializable_keys = ("memory",)
 
+    __slots__ = (
+        "stepwise",
+        "is_running",
+        "_broker_log_size",
+        "_accepted_types",
+        "_buffered_event_paths",
+        "_queues",
+        "_subscribers",
+        "_waiter_event_types",
+        "_tasks",
+        "_broker_log",
+        "_cancel_flag",
+        "_step_flags",
+        "_step_events_holding",
+        "_step_conditions",
+        "_accepted_events",
+        "_retval",
+        "_in_progress",
+        "_in_progress_lock",
+        "_currently_running_steps",
+        "_running_lock",
+        "_streaming_queue",
+        "_event_buffers",
+        "_globals_lock",
+        "_globals",
+        # Workflows keep track of their contexts in a WeakSet
+        "__weakref__",
+    )
+
     def __init__(
         self,
         workflow: "Workflow",
         stepwise: bool = False,
+        broker_log_size: Optional[Any] = Ellipsis,
     ) -> None:
         self.stepwise = stepwise
         self.is_running = False
-        # Store the step configs of this workflow, to be used in send_event
-        self._step_configs: dict[str, Optional[StepConfig]] = {}
-        for step_name, step_func in workflow._get_steps().items():
-            self._step_configs[step_name] = getattr(step_func, "__step_config", None)
+        self._broker_log_size: Optional[int] = (
+            workflow._broker_log_size
+            if broker_log_size is Ellipsis
+            else broker_log_size
+        )
+        # The event types each step accepts, to route events in constant time
+        step_configs: Dict[str, Optional[StepConfig]] = {
+            step_name: getattr(step_func, "__step_config", None)
+            for step_name, step_func in workflow._get_steps().items()
+        }
+        self._accepted_types: Dict[str, FrozenSet[Type[Event]]] = {
+            step_name: frozenset(step_config.accepted_events if step_config else ())
+            for step_name, step_config in step_configs.items()
+        }
+
+        # Event types accepted by any step, used to presize event buffers
+        self._buffered_event_paths: Tuple[str, ...] = tuple(
+            {
+                _get_full_path(ev_type)
+                for accepted_types in self._accepted_types.values()
+                for ev_type in accepted_types
+            }
+        )
 
         # Init broker machinery
         self._init_broker_data()
 
         # Global data storage
-        self._lock = asyncio.Lock()
+        self._globals_lock = asyncio.Lock()
         self._globals: Dict[str, Any] = {}
 
     def _init_broker_data(self) -> None:
         self._queues: Dict[str, asyncio.Queue] = {}
+        # Map event types to the queues that should receive them when broadcasted.
+        # This is filled lazily and must be reset whenever a queue is added.
+        self._subscribers: Dict[Type[Event], List[asyncio.Queue]] = {}
+        # The event type each waiter queue is waiting for. Waiter queues restored
+        # from a serialized Context are missing until `wait_for_event` runs again.
+        self._waiter_event_types: Dict[str, Type[Event]] = {}
         self._tasks: Set[asyncio.Task] = set()
-        self._broker_log: List[Event] = []
+        self._broker_log: Deque[Event] = deque(maxlen=self._broker_log_size)
         self._cancel_flag: asyncio.Event = asyncio.Event()
         self._step_flags: Dict[str, asyncio.Event] = {}
         self._step_events_holding: Optional[List[Event]] = None
-        self._step_lock: asyncio.Lock = asyncio.Lock()
-        self._step_condition: asyncio.Condition = asyncio.Condition(
-            lock=self._step_lock
-        )
-        self._step_event_written: asyncio.Condition = asyncio.Condition(
-            lock=self._step_lock
+        # Stepwise synchronization, created on first use
+        self._step_conditions: Optional[Tuple[asyncio.Condition, asyncio.Condition]] = (
+            None
         )
         self._accepted_events: List[Tuple[str, str]] = []
         self._retval: RunResultT = None
         # Map the step names that were executed to a list of events they received.
         # This will be serialized, and is needed to resume a Workflow run passing
         # an existing context.
-        self._in_progress: Dict[str, List[Event]] = defaultdict(list)
+        # Events are keyed by their id so that they can be removed in constant time.
+        self._in_progress: Dict[str, Dict[int, Event]] = defaultdict(dict)
+        self._in_progress_lock = asyncio.Lock()
         # Keep track of the steps currently running. This is only valid when a
         # workflow is running and won't be serialized. Note that a single step
         # might have multiple workers, so we keep a counter.
         self._currently_running_steps: DefaultDict[str, int] = defaultdict(int)
+        self._running_lock = asyncio.Lock()
         # Streaming machinery
         self._streaming_queue: asyncio.Queue = asyncio.Queue()
         # Step-specific instance
         self._event_buffers: Dict[str, EventBuffer] = {}
 
     def _serialize_queue(self, queue: asyncio.Queue, serializer: BaseSerializer) -> str:
-        queue_items = list(queue._queue)  # type: ignore
-        queue_objs = [serializer.serialize(obj) for obj in queue_items]
-        return json.dumps(queue_objs)  # type: ignore
+        # Serialize straight from the underlying deque to avoid copying the queue
+        return serializer.serialize_many(queue._queue)  # type: ignore
 
-    def _deserialize_queue(
-        self,
-        queue_str: str,
-        serializer: BaseSerializer,
-        prefix_queue_objs: List[Any] = [],
-    ) -> asyncio.Queue:
-        queue_objs = json.loads(queue_str)
-        queue_objs = prefix_queue_objs + queue_objs
-        queue = asyncio.Queue()  # type: ignore
-        for obj in queue_objs:
-            event_obj = serializer.deserialize(obj)
-            queue.put_nowait(event_obj)
-        return queue
+    def _deserialize_events(
+        self, events_data: Union[str, List[Any]], serializer: BaseSerializer
+    ) -> List[Any]:
+        if isinstance(events_data, list):
+            # Older payloads store a list of individually serialized events
+            return [serializer.deserialize(ev) for ev in events_data]
+        return serializer.deserialize_many(events_data)
 
     def _serialize_globals(self, serializer: BaseSerializer) -> Dict[str, Any]:
         serialized_globals = {}
@@ -160,9 +251,10 @@ class Context:
         return deserialized_globals
 
     def to_dict(self, serializer: Optional[BaseSerializer] = None) -> Dict[str, Any]:
-        serializer = serializer or JsonSerializer()
+        serializer = serializer or _DEFAULT_SERIALIZER
 
         return {
+            "version": CONTEXT_PAYLOAD_VERSION,
             "globals": self._serialize_globals(serializer),
             "streaming_queue": self._serialize_queue(self._streaming_queue, serializer),
             "queues": {
@@ -171,20 +263,61 @@ class Context:
             "stepwise": self.stepwise,
             "event_buffers": {
                 k: {
-                    inner_k: [serializer.serialize(ev) for ev in inner_v]
+                    inner_k: serializer.serialize_many(inner_v)
                     for inner_k, inner_v in v.items()
+                    if inner_v
                 }
                 for k, v in self._event_buffers.items()
             },
             "in_progress": {
-                k: [serializer.serialize(ev) for ev in v]
+                k: serializer.serialize_many(list(v.values()))
                 for k, v in self._in_progress.items()
             },
             "accepted_events": self._accepted_events,
-            "broker_log": [serializer.serialize(ev) for ev in self._broker_log],
+            "broker_log": serializer.serialize_many(self._broker_log),
+            "broker_log_size": self._broker_log_size,
             "is_running": self.is_running,
         }
 
+    async def ato_dict(
+        self, serializer: Optional[BaseSerializer] = None
+    ) -> Dict[str, Any]:
+        """
+        Async version of `to_dict`, serializing the events in a worker thread.
+
+        Large contexts should use this method to avoid blocking the event loop while they're
+        being serialized. The event containers are copied before handing them over to the
+        thread, so the workflow can keep running in the meantime. The global data is still
+        serialized on the event loop, since running steps might change the values stored.
+        """
+        serializer = serializer or _DEFAULT_SERIALIZER
+
+        serialized_globals = self._serialize_globals(serializer)
+        data = await asyncio.to_thread(self._snapshot().to_dict, serializer)
+        data["globals"] = serialized_globals
+        return data
+
+    def _snapshot(self) -> "Context":
+        """Returns a shallow copy of the Context holding copies of the events to serialize."""
+        snapshot = copy.copy(self)
+        # The global data is serialized by the caller
+        snapshot._globals = {}
+        snapshot._streaming_queue = self._copy_queue(self._streaming_queue)
+        snapshot._queues = {k: self._copy_queue(v) for k, v in self._queues.items()}
+        snapshot._event_buffers = {
+            k: {inner_k: deque(inner_v) for inner_k, inner_v in v.items()}
+            for k, v in self._event_buffers.items()
+        }
+        snapshot._in_progress = {k: dict(v) for k, v in self._in_progress.items()}
+        snapshot._accepted_events = list(self._accepted_events)
+        snapshot._broker_log = deque(self._broker_log)
+        return snapshot
+
+    def _copy_queue(self, queue: asyncio.Queue) -> asyncio.Queue:
+        queue_copy: asyncio.Queue = asyncio.Queue()
+        _bulk_put(queue_copy, list(queue._queue))  # type: ignore
+        return queue_copy
+
     @classmethod
     def from_dict(
         cls,
@@ -192,42 +325,103 @@ class Context:
         data: Dict[str, Any],
         serializer: Optional[BaseSerializer] = None,
     ) -> "Context":
-        serializer = serializer or JsonSerializer()
+        serializer = serializer or _DEFAULT_SERIALIZER
+
+        context = cls(workflow)
+        context._restore_queues(*context._load_dict(data, serializer))
+        return context
+
+    @classmethod
+    async def afrom_dict(
+        cls,
+        workflow: "Workflow",
+        data: Dict[str, Any],
+        serializer: Optional[BaseSerializer] = None,
+    ) -> "Context":
+        """
+        Async version of `from_dict`, deserializing the payload in a worker thread.
+
+        Large payloads should use this method to avoid blocking the event loop while they're
+        being deserialized.
+        """
+        serializer = serializer or _DEFAULT_SERIALIZER
+
+        context = cls(workflow)
+        # The queues are asyncio objects, only create them on the event loop
+        queues_events = await asyncio.to_thread(context._load_dict, data, serializer)
+        context._restore_queues(*queues_events)
+        return context
+
+    def _load_dict(
+        self, data: Dict[str, Any], serializer: BaseSerializer
+    ) -> Tuple[List[Event], Dict[str, List[Event]]]:
+        """
+        Load the state serialized by `to_dict` into this Context, except for the queues.
+
+        No asyncio object is created here, so that this can run in a worker thread. The
+        events to put in the streaming queue and in every other queue are returned instead.
+        """
+        version = data.get("version", 1)
+        if version > CONTEXT_PAYLOAD_VERSION:
+            msg = (
+                f"Error creating a Context instance: the provided payload has version {version}, "
+                f"while the highest version supported is {CONTEXT_PAYLOAD_VERSION}."
+            )
+            raise ContextSerdeError(msg)
 
         try:
-            context = cls(workflow, stepwise=data["stepwise"])
-            context._globals = context._deserialize_globals(data["globals"], serializer)
-            context._streaming_queue = context._deserialize_queue(
+            self.stepwise = data["stepwise"]
+            self._globals = self._deserialize_globals(data["globals"], serializer)
+            streaming_events = self._deserialize_events(
                 data["streaming_queue"], serializer
             )
 
-            context._event_buffers = {}
+            self._event_buffers = {}
             for buffer_id, type_events_map in data["event_buffers"].items():
-                context._event_buffers[buffer_id] = {}
+                self._event_buffers[buffer_id] = self._new_event_buffer()
                 for event_type, events_list in type_events_map.items():
-                    context._event_buffers[buffer_id][event_type] = [
-                        serializer.deserialize(ev) for ev in events_list
-                    ]
-
-            context._accepted_events = data["accepted_events"]
-            context._broker_log = [
-                serializer.deserialize(ev) for ev in data["broker_log"]
-            ]
-            context.is_running = data["is_running"]
+                    self._event_buffers[buffer_id][event_type] = deque(
+                        self._deserialize_events(events_list, serializer)
+                    )
+
+            self._accepted_events = data["accepted_events"]
+            # Older payloads don't carry the size, keep the one of the workflow
+            self._broker_log_size = data.get("broker_log_size", self._broker_log_size)
+            self._broker_log = deque(
+                self._deserialize_events(data["broker_log"], serializer),
+                maxlen=self._broker_log_size,
+            )
+            self.is_running = data["is_running"]
             # load back up whatever was in the queue as well as the events whose steps
             # were in progress when the serialization of the Context took place
-            context._queues = {
-                k: context._deserialize_queue(
-                    v, serializer, prefix_queue_objs=data["in_progress"].get(k, [])
+            queues_events: Dict[str, List[Event]] = {}
+            for k, v in data["queues"].items():
+                events = self._deserialize_events(
+                    data["in_progress"].get(k, []), serializer
                 )
-                for k, v in data["queues"].items()
-            }
-            context._in_progress = defaultdict(list)
-            return context
+                events.extend(serializer.deserialize_many(v))
+                queues_events[k] = events
+            self._in_progress = defaultdict(dict)
         except KeyError as e:
             msg = "Error creating a Context instance: the provided payload has a wrong or old format."
             raise ContextSerdeError(msg) from e
 
+        return streaming_events, queues_events
+
+    def _restore_queues(
+        self, streaming_events: List[Event], queues_events: Dict[str, List[Event]]
+    ) -> None:
+        streaming_queue: asyncio.Queue = asyncio.Queue()
+        _bulk_put(streaming_queue, streaming_events)
+        self._streaming_queue = streaming_queue
+
+        self._queues = {}
+        for k, events in queues_events.items():
+            queue: asyncio.Queue = asyncio.Queue()
+            _bulk_put(queue, events)
+            self._queues[k] = queue
+        self._subscribers.clear()
+
     async def set(self, key: str, value: Any, make_private: bool = False) -> None:
         """
         Store `value` into the Context under `key`.
@@ -245,8 +439,22 @@ class Context:
                 "`make_private` is deprecated and will be ignored", DeprecationWarning
             )
 
-        async with self.lock:
-            self._globals[key] = value
+        # Still honor the lock, so we don't write while someone else holds `ctx.lock`
+        async with self._globals_lock:
+            self.set_sync(key, value)
+
+    def set_sync(self, key: str, value: Any) -> None:
+        """
+        Store `value` into the Context under `key`, without awaiting.
+
+        Unlike `set`, this doesn't wait for `lock` to be released.
+
+        Args:
+            key: A unique string to identify the value stored.
+            value: The data to be stored.
+
+        """
+        self._globals[key] = value
 
     async def mark_in_progress(self, name: str, ev: Event) -> None:
         """
@@ -257,8 +465,8 @@ class Context:
             ev (Event): The input event that kicked off this step.
 
         """
-        async with self.lock:
-            self._in_progress[name].append(ev)
+        async with self._in_progress_lock:
+            self._in_progress[name][id(ev)] = ev
 
     async def remove_from_in_progress(self, name: str, ev: Event) -> None:
         """
@@ -269,23 +477,35 @@ class Context:
             ev (Event): The associated input event that kicked of this completed step.
 
         """
-        async with self.lock:
-            events = [e for e in self._in_progress[name] if e != ev]
-            self._in_progress[name] = events
+        async with self._in_progress_lock:
+            self._in_progress[name].pop(id(ev), None)
 
     async def add_running_step(self, name: str) -> None:
-        async with self.lock:
+        async with self._running_lock:
             self._currently_running_steps[name] += 1
 
     async def remove_running_step(self, name: str) -> None:
-        async with self.lock:
+        async with self._running_lock:
             self._currently_running_steps[name] -= 1
             if self._currently_running_steps[name] == 0:
                 del self._currently_running_steps[name]
 
     async def running_steps(self) -> List[str]:
-        async with self.lock:
-            return list(self._currently_running_steps)
+        """
+        Returns the names of the steps currently running.
+
+        No lock is needed here: the counters are only updated by tasks running on the same
+        event loop, and a task can't be preempted while the snapshot is being copied.
+        """
+        return list(self._currently_running_steps)
+
+    def get_in_progress_snapshot(self) -> Dict[str, List[Event]]:
+        """Returns a copy of the input events of the steps in progress, keyed by step name."""
+        return {
+            name: list(events.values())
+            for name, events in self._in_progress.items()
+            if events
+        }
 
     async def get(self, key: str, default: Optional[Any] = Ellipsis) -> Any:
         """
@@ -299,10 +519,25 @@ class Context:
             ValueError: When there's not value accessible corresponding to `key`.
 
         """
-        async with self.lock:
-            if key in self._globals:
-                return self._globals[key]
-            elif default is not Ellipsis:
+        return self.get_sync(key, default=default)
+
+    def get_sync(self, key: str, default: Optional[Any] = Ellipsis) -> Any:
+        """
+        Get the value corresponding to `key` from the Context, without awaiting.
+
+        Args:
+            key: A unique string to identify the value stored.
+            default: The value to return when `key` is missing instead of raising an exception.
+
+        Raises:
+            ValueError: When there's not value accessible corresponding to `key`.
+
+        """
+        # Dict lookups can't be interleaved by other coroutines, no need to lock
+        try:
+            return self._globals[key]
+        except KeyError:
+            if default is not Ellipsis:
                 return default
 
         msg = f"Key '{key}' not found in Context"
@@ -321,8 +556,8 @@ class Context:
 
     @property
     def lock(self) -> asyncio.Lock:
-        """Returns a mutex to lock the Context."""
-        return self._lock
+        """Returns a mutex to lock the global data storage of the Context."""
+        return self._globals_lock
 
     @property
     def session(self) -> "Context":  # pragma: no cover
@@ -331,9 +566,6 @@ class Context:
         warnings.warn(msg, DeprecationWarning, stacklevel=2)
         return self
 
-    def _get_full_path(self, ev_type: Type[Event]) -> str:
-        return f"{ev_type.__module__}.{ev_type.__name__}"
-
     def _get_event_buffer_id(self, events: List[Type[Event]]) -> str:
         # Try getting the current task name
         try:
@@ -348,7 +580,10 @@ class Context:
             pass
 
         # Fall back to creating a stable identifier from expected events
-        return ":".join(sorted(self._get_full_path(e_type) for e_type in events))
+        return ":".join(sorted(_get_full_path(e_type) for e_type in events))
+
+    def _new_event_buffer(self) -> EventBuffer:
+        return {ev_path: deque() for ev_path in self._buffered_event_paths}
 
     def collect_events(
         self, ev: Event, expected: List[Type[Event]], buffer_id: Optional[str] = None
@@ -358,7 +593,7 @@ class Context:
 
         This method adds the current event to the internal buffer and attempts to collect all
         expected event types. If all expected events are found, they will be returned in order.
-        Otherwise, it returns None and restores any collected events back to the buffer.
+        Otherwise, it returns None and leaves the buffered events untouched.
 
         Args:
             ev (Event): The current event to add to the buffer.
@@ -374,32 +609,24 @@ class Context:
         """
         buffer_id = buffer_id or self._get_event_buffer_id(expected)
 
-        if buffer_id not in self._event_buffers:
-            self._event_buffers[buffer_id] = defaultdict(list)
+        event_buffer = self._event_buffers.get(buffer_id)
+        if event_buffer is None:
+            event_buffer = self._event_buffers[buffer_id] = self._new_event_buffer()
 
-        event_type_path = self._get_full_path(type(ev))
-        self._event_buffers[buffer_id][event_type_path].append(ev)
+        event_type_path = _get_full_path(type(ev))
+        ev_instances = event_buffer.get(event_type_path)
+        if ev_instances is None:
+            # Not a type accepted by any step, but nothing prevents collecting it
+            ev_instances = event_buffer[event_type_path] = deque()
+        ev_instances.append(ev)
 
-        retval: List[Event] = []
-        for e_type in expected:
-            e_type_path = self._get_full_path(e_type)
-            e_instance_list = self._event_buffers[buffer_id].get(e_type_path, [])
-            if e_instance_list:
-                retval.append(e_instance_list.pop(0))
-            else:
-                # We already know we don't have all the events
-                break
+        # Make sure all the expected events are there before taking any of them
+        for e_type_path, count in _get_expected_counts(tuple(expected)):
+            e_instance_list = event_buffer.get(e_type_path)
+            if e_instance_list is None or len(e_instance_list) < count:
+                return None
 
-        if len(retval) == len(expected):
-            return retval
-
-        # put back the events if unable to collect all
-        for i, ev_to_restore in enumerate(retval):
-            e_type = type(retval[i])
-            e_type_path = self._get_full_path(e_type)
-            self._event_buffers[buffer_id][e_type_path].append(ev_to_restore)
-
-        return None
+        return [event_buffer[_get_full_path(e_type)].popleft() for e_type in expected]
 
     def add_holding_event(self, event: Event) -> None:
         """
@@ -424,27 +651,46 @@ class Context:
         """
         Sends an event to a specific step in the workflow.
 
-        If step is None, the event is sent to all the receivers and we let
-        them discard events they don't want.
+        If step is None, the event is sent to all the steps and the waiters accepting
+        its type, letting them discard events they don't want.
         """
         self.add_holding_event(message)
 
         if step is None:
-            for queue in self._queues.values():
+            for queue in self._get_subscribers(type(message)):
                 queue.put_nowait(message)
         else:
-            if step not in self._step_configs:
+            accepted_types = self._accepted_types.get(step)
+            if accepted_types is None:
                 raise WorkflowRuntimeError(f"Step {step} does not exist")
 
-            step_config = self._step_configs[step]
-            if step_config and type(message) in step_config.accepted_events:
+            if type(message) in accepted_types:
                 self._queues[step].put_nowait(message)
             else:
                 raise WorkflowRuntimeError(
                     f"Step {step} does not accept event of type {type(message)}"
                 )
 
-        self._broker_log.append(message)
+        if self._broker_log_size != 0:
+            self._broker_log.append(message)
+
+    def _get_subscribers(self, event_type: Type[Event]) -> List[asyncio.Queue]:
+        subscribers = self._subscribers.get(event_type)
+        if subscribers is None:
+            subscribers = []
+            for name, queue in self._queues.items():
+                accepted_types = self._accepted_types.get(name)
+                if accepted_types is None:
+                    # Not a step, this is a waiter queue
+                    waiter_event_type = self._waiter_event_types.get(name)
+                    if waiter_event_type is None or waiter_event_type is event_type:
+                        subscribers.append(queue)
+                elif event_type in accepted_types:
+                    subscribers.append(queue)
+
+            self._subscribers[event_type] = subscribers
+
+        return subscribers
 
     async def wait_for_event(
         self,
@@ -476,18 +722,23 @@ class Context:
         requirements = requirements or {}
 
         # Generate a unique key for the waiter
-        event_str = self._get_full_path(event_type)
+        event_str = _get_full_path(event_type)
         requirements_str = str(requirements)
         waiter_id = waiter_id or f"waiter_{event_str}_{requirements_str}"
 
         if waiter_id not in self._queues:
             self._queues[waiter_id] = asyncio.Queue()
 
+        if self._waiter_event_types.get(waiter_id) is not event_type:
+            # Only route events of the requested type to this waiter
+            self._waiter_event_types[waiter_id] = event_type
+            self._subscribers.clear()
+
         # send the waiter event if it's not already sent
         if waiter_event is not None:
-            is_waiting = await self.get(waiter_id, default=False)
+            is_waiting = self.get_sync(waiter_id, default=False)
             if not is_waiting:
-                await self.set(waiter_id, True)
+                self.set_sync(waiter_id, True)
                 self.write_event_to_stream(waiter_event)
 
         while True:
@@ -495,6 +746,7 @@ class Context:
                 event = await asyncio.wait_for(
                     self._queues[waiter_id].get(), timeout=timeout
                 )
+                # A queue restored from a serialized Context might hold other events
                 if type(event) is event_type:
                     if all(
                         event.get(k, default=None) == v for k, v in requirements.items()
@@ -503,7 +755,7 @@ class Context:
                     else:
                         continue
             finally:
-                await self.set(waiter_id, False)
+                self.set_sync(waiter_id, False)
 
     def write_event_to_stream(self, ev: Optional[Event]) -> None:
         self._streaming_queue.put_nowait(ev)
@@ -516,6 +768,24 @@ class Context:
     def streaming_queue(self) -> asyncio.Queue:
         return self._streaming_queue
 
+    @property
+    def _step_condition(self) -> asyncio.Condition:
+        return self._get_step_conditions()[0]
+
+    @property
+    def _step_event_written(self) -> asyncio.Condition:
+        return self._get_step_conditions()[1]
+
+    def _get_step_conditions(self) -> Tuple[asyncio.Condition, asyncio.Condition]:
+        if self._step_conditions is None:
+            # Both conditions share the same lock
+            step_lock = asyncio.Lock()
+            self._step_conditions = (
+                asyncio.Condition(lock=step_lock),
+                asyncio.Condition(lock=step_lock),
+            )
+        return self._step_conditions
+
     def clear(self) -> None:
         """Clear any data stored in the context."""
         # Clear the user data storage
@@ -2,7 +2,7 @@ import base64
 import json
 import pickle
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List, Sequence
 from pydantic import BaseModel
 
 from llama_index.core.schema import BaseComponent
@@ -16,6 +16,14 @@ class BaseSerializer(ABC):
     @abstractmethod
     def deserialize(self, value: str) -> Any: ...
 
+    def serialize_many(self, values: Sequence[Any]) -> str:
+        """Serialize a sequence of values into a single string."""
+        return json.dumps([self.serialize(value) for value in values])
+
+    def deserialize_many(self, value: str) -> List[Any]:
+        """Deserialize a string produced by `serialize_many` into a list of values."""
+        return [self.deserialize(item) for item in json.loads(value)]
+
 
 class JsonSerializer(BaseSerializer):
     def _serialize_value(self, value: Any) -> Any:
@@ -63,6 +71,21 @@ class JsonSerializer(BaseSerializer):
         data = json.loads(value)
         return self._deserialize_value(data)
 
+    def serialize_many(self, values: Sequence[Any]) -> str:
+        """Serialize all the values in a single JSON document."""
+        try:
+            serialized_values = [self._serialize_value(value) for value in values]
+            return json.dumps({"__is_many": True, "values": serialized_values})
+        except Exception as e:
+            raise ValueError(f"Failed to serialize values: {e!s}")
+
+    def deserialize_many(self, value: str) -> List[Any]:
+        data = json.loads(value)
+        if isinstance(data, dict) and data.get("__is_many"):
+            return [self._deserialize_value(item) for item in data["values"]]
+        # Older payloads store a list of individually serialized values
+        return [self.deserialize(item) for item in data]
+
 
 class JsonPickleSerializer(JsonSerializer):
     def serialize(self, value: Any) -> str:
@@ -78,3 +101,32 @@ class JsonPickleSerializer(JsonSerializer):
             return pickle.loads(base64.b64decode(value))
         except Exception:
             return super().deserialize(value)
+
+    def serialize_many(self, values: Sequence[Any]) -> str:
+        """Serialize in a single JSON pass, falling back to serializing each value."""
+        try:
+            return super().serialize_many(values)
+        except Exception:
+            return BaseSerializer.serialize_many(self, values)
+
+
+class PickleSerializer(BaseSerializer):
+    """
+    Serialize values with Pickle.
+
+    The output is not human-readable and must only be loaded from trusted sources, but
+    it's faster to produce than JSON, especially for contexts holding many events.
+    """
+
+    def serialize(self, value: Any) -> str:
+        return base64.b64encode(pickle.dumps(value, protocol=5)).decode("utf-8")
+
+    def deserialize(self, value: str) -> Any:
+        return pickle.loads(base64.b64decode(value))
+
+    def serialize_many(self, values: Sequence[Any]) -> str:
+        """Pickle all the values at once."""
+        return self.serialize(values)
+
+    def deserialize_many(self, value: str) -> List[Any]:
+        return list(self.deserialize(value))
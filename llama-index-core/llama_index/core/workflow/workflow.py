@@ -18,7 +18,7 @@ from llama_index.core.instrumentation import get_dispatcher
 from llama_index.core.workflow.types import RunResultT
 
 from .checkpointer import Checkpoint, CheckpointCallback
-from .context import Context
+from .context import DEFAULT_BROKER_LOG_SIZE, Context
 from .context_serializers import BaseSerializer, JsonSerializer
 from .decorators import StepConfig, step
 from .errors import *
@@ -69,6 +69,7 @@ class Workflow(metaclass=WorkflowMeta):
         verbose: bool = False,
         service_manager: Optional[ServiceManager] = None,
         num_concurrent_runs: Optional[int] = None,
+        broker_log_size: Optional[int] = DEFAULT_BROKER_LOG_SIZE,
     ) -> None:
         """
         Create an instance of the workflow.
@@ -89,6 +90,9 @@ class Workflow(metaclass=WorkflowMeta):
             num_concurrent_runs:
                 maximum number of .run() executions occurring simultaneously. If set to `None`, there
                 is no limit to this number.
+            broker_log_size:
+                maximum number of events kept in the broker log of the contexts created by this workflow. If set
+                to `None`, all the events are kept, if set to `0` the broker log is disabled.
 
         """
         # Configuration
@@ -96,6 +100,7 @@ class Workflow(metaclass=WorkflowMeta):
         self._verbose = verbose
         self._disable_validation = disable_validation
         self._num_concurrent_runs = num_concurrent_runs
+        self._broker_log_size = broker_log_size
         self._stop_event_class = self._ensure_stop_event_class()
         self._start_event_class = self._ensure_start_event_class()
         self._sem = (
@@ -258,11 +263,11 @@ class Workflow(metaclass=WorkflowMeta):
             step_config: StepConfig = getattr(step_func, "__step_config")
 
             # Make the system step "_done" accept custom stop events
-            if (
-                name == "_done"
-                and self._stop_event_class not in step_config.accepted_events
-            ):
-                step_config.accepted_events.append(self._stop_event_class)
+            if name == "_done":
+                if self._stop_event_class not in step_config.accepted_events:
+                    step_config.accepted_events.append(self._stop_event_class)
+                # the context might have cached the accepted events before they changed
+                ctx._accepted_types[name] = frozenset(step_config.accepted_events)
 
             for _ in range(step_config.num_workers):
                 ctx.add_step_worker(
@@ -277,6 +282,9 @@ class Workflow(metaclass=WorkflowMeta):
                     dispatcher=dispatcher,
                 )
 
+        # queues might have been added, reset the event routing
+        ctx._subscribers.clear()
+
         # add dedicated cancel task
         ctx.add_cancel_worker()
 
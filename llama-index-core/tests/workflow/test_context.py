@@ -0,0 +1,419 @@
+import asyncio
+import json
+
+import pytest
+from llama_index.core.workflow.context import CONTEXT_PAYLOAD_VERSION, Context
+from llama_index.core.workflow.context_serializers import (
+    JsonSerializer,
+    PickleSerializer,
+)
+from llama_index.core.workflow.errors import ContextSerdeError, WorkflowRuntimeError
+from llama_index.core.workflow.decorators import step
+from llama_index.core.workflow.events import StartEvent, StopEvent
+from llama_index.core.workflow.workflow import Workflow
+
+
+def _full_path(ev_type: type) -> str:
+    return f"{ev_type.__module__}.{ev_type.__name__}"
+
+
+def _legacy_payload(serializer: JsonSerializer, events: list) -> dict:
+    """A payload as produced by `to_dict` before payloads were versioned."""
+    OneTestEvent, AnotherTestEvent = events
+    return {
+        "globals": {"foo": serializer.serialize("bar")},
+        "streaming_queue": json.dumps([serializer.serialize(OneTestEvent())]),
+        "queues": {
+            "middle_step": json.dumps(
+                [serializer.serialize(OneTestEvent(test_param="queued"))]
+            )
+        },
+        "stepwise": False,
+        "event_buffers": {
+            "buffer": {
+                _full_path(AnotherTestEvent): [serializer.serialize(AnotherTestEvent())]
+            }
+        },
+        "in_progress": {
+            "middle_step": [
+                serializer.serialize(OneTestEvent(test_param="in_progress"))
+            ]
+        },
+        "accepted_events": [("start_step", "StartEvent")],
+        "broker_log": [serializer.serialize(StartEvent())],
+        "is_running": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_from_dict_legacy_payload(workflow, events):
+    OneTestEvent, AnotherTestEvent = events
+    ctx = Context.from_dict(workflow, _legacy_payload(JsonSerializer(), events))
+
+    assert await ctx.get("foo") == "bar"
+    assert ctx.streaming_queue.get_nowait() == OneTestEvent()
+    # events that were in progress are queued first
+    queue = ctx._queues["middle_step"]
+    assert queue.get_nowait().test_param == "in_progress"
+    assert queue.get_nowait().test_param == "queued"
+    assert list(ctx._event_buffers["buffer"][_full_path(AnotherTestEvent)]) == [
+        AnotherTestEvent()
+    ]
+    assert list(ctx._broker_log) == [StartEvent()]
+    assert ctx._accepted_events == [("start_step", "StartEvent")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("serializer", [JsonSerializer(), PickleSerializer()])
+async def test_to_dict_round_trip(workflow, events, serializer):
+    OneTestEvent, AnotherTestEvent = events
+    ctx = Context(workflow)
+    await ctx.set("foo", {"bar": [1, 2]})
+    ctx._queues["middle_step"] = asyncio.Queue()
+    ctx.send_event(OneTestEvent(test_param="queued"))
+    ctx.write_event_to_stream(AnotherTestEvent())
+    ctx.collect_events(
+        OneTestEvent(test_param="buffered"), [OneTestEvent, OneTestEvent]
+    )
+    await ctx.mark_in_progress("middle_step", OneTestEvent(test_param="in_progress"))
+
+    data = ctx.to_dict(serializer=serializer)
+    assert data["version"] == CONTEXT_PAYLOAD_VERSION
+    new_ctx = Context.from_dict(workflow, data, serializer=serializer)
+
+    assert await new_ctx.get("foo") == {"bar": [1, 2]}
+    assert new_ctx.streaming_queue.get_nowait() == AnotherTestEvent()
+    queue = new_ctx._queues["middle_step"]
+    assert queue.get_nowait().test_param == "in_progress"
+    assert queue.get_nowait().test_param == "queued"
+    buffers = list(new_ctx._event_buffers.values())
+    assert [list(b[_full_path(OneTestEvent)]) for b in buffers] == [
+        [OneTestEvent(test_param="buffered")]
+    ]
+    assert list(new_ctx._broker_log) == [OneTestEvent(test_param="queued")]
+
+
+def test_from_dict_newer_version(workflow):
+    data = Context(workflow).to_dict()
+    data["version"] = CONTEXT_PAYLOAD_VERSION + 1
+
+    with pytest.raises(ContextSerdeError):
+        Context.from_dict(workflow, data)
+
+
+class MyStopEvent(StopEvent):
+    outcome: str
+
+
+class CustomStopWorkflow(Workflow):
+    @step
+    async def start_step(self, ev: StartEvent) -> MyStopEvent:
+        return MyStopEvent(outcome="done")
+
+
+@pytest.fixture()
+def done_step_config():
+    # The config of the system step "_done" is shared by all the workflows, and
+    # running a workflow with a custom stop event changes it for good
+    config = getattr(Workflow._done, "__step_config")
+    accepted_events = list(config.accepted_events)
+    yield config
+    config.accepted_events[:] = accepted_events
+
+
+@pytest.mark.asyncio
+async def test_custom_stop_event_routing(done_step_config):
+    wf = CustomStopWorkflow()
+    # contexts created before the first run don't know about the custom stop event yet
+    ctx = Context(wf)
+    other_ctx = Context(wf)
+    assert MyStopEvent not in ctx._accepted_types["_done"]
+
+    result = await wf.run(ctx=other_ctx)
+    assert result.outcome == "done"
+    result = await wf.run(ctx=ctx)
+    assert result.outcome == "done"
+    assert MyStopEvent in ctx._accepted_types["_done"]
+
+
+@pytest.mark.asyncio
+async def test_ato_dict_afrom_dict(workflow, events):
+    OneTestEvent, _ = events
+    ctx = Context(workflow)
+    await ctx.set("foo", "bar")
+    ctx._queues["middle_step"] = asyncio.Queue()
+    ctx.send_event(OneTestEvent(test_param="queued"))
+
+    data = await ctx.ato_dict()
+    assert data == ctx.to_dict()
+    # the snapshot must leave the Context untouched
+    assert ctx._queues["middle_step"].qsize() == 1
+
+    new_ctx = await Context.afrom_dict(workflow, data)
+    assert await new_ctx.get("foo") == "bar"
+    assert new_ctx._queues["middle_step"].get_nowait().test_param == "queued"
+
+
+@pytest.mark.asyncio
+async def test_ato_dict_with_concurrent_changes(ctx):
+    big = {str(i): i for i in range(200_000)}
+    await ctx.set("big", big)
+    stop = asyncio.Event()
+
+    async def mutate() -> None:
+        i = 0
+        while not stop.is_set():
+            big[f"new_{i}"] = i
+            i += 1
+            await asyncio.sleep(0)
+
+    mutator = asyncio.create_task(mutate())
+    await asyncio.sleep(0)
+    try:
+        data = await ctx.ato_dict()
+    finally:
+        stop.set()
+        await mutator
+
+    assert len(json.loads(data["globals"]["big"])) >= 200_000
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("broker_log_size", "expected_len"), [(0, 0), (None, 4), (2, 2)]
+)
+async def test_broker_log_size(workflow, broker_log_size, expected_len):
+    wf = type(workflow)(broker_log_size=broker_log_size)
+    handler = wf.run()
+    await handler
+    ctx = handler.ctx
+
+    assert ctx._broker_log.maxlen == broker_log_size
+    assert len(ctx._broker_log) == expected_len
+
+    for new_ctx in (
+        Context.from_dict(workflow, ctx.to_dict()),
+        await Context.afrom_dict(workflow, await ctx.ato_dict()),
+    ):
+        assert new_ctx._broker_log_size == broker_log_size
+        assert [type(ev) for ev in new_ctx._broker_log] == [
+            type(ev) for ev in ctx._broker_log
+        ]
+        new_ctx.send_event(StartEvent())
+        assert len(new_ctx._broker_log) == (
+            expected_len + 1 if broker_log_size is None else expected_len
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("broker_log_size", [0, None, 2])
+async def test_broker_log_size_provided_context(workflow, broker_log_size):
+    wf = type(workflow)(broker_log_size=broker_log_size)
+    ctx = Context(wf)
+    assert ctx._broker_log.maxlen == broker_log_size
+
+    await wf.run(ctx=ctx)
+    assert len(ctx._broker_log) == (4 if broker_log_size is None else broker_log_size)
+    # the size passed to the Context takes precedence
+    assert Context(wf, broker_log_size=5)._broker_log.maxlen == 5
+
+
+@pytest.mark.asyncio
+async def test_running_steps(ctx):
+    await ctx.add_running_step("start_step")
+    await ctx.add_running_step("start_step")
+    await ctx.add_running_step("middle_step")
+    assert await ctx.running_steps() == ["start_step", "middle_step"]
+
+    await ctx.remove_running_step("start_step")
+    await ctx.remove_running_step("middle_step")
+    assert await ctx.running_steps() == ["start_step"]
+
+
+def test_collect_events(ctx, events):
+    OneTestEvent, AnotherTestEvent = events
+    expected = [OneTestEvent, AnotherTestEvent, OneTestEvent]
+
+    assert ctx.collect_events(OneTestEvent(test_param="1"), expected, "step") is None
+    assert ctx.collect_events(AnotherTestEvent(), expected, "step") is None
+    # nothing is taken from the buffer until all the expected events are there
+    assert ctx.collect_events(AnotherTestEvent(), expected, "step") is None
+    collected = ctx.collect_events(OneTestEvent(test_param="2"), expected, "step")
+
+    assert collected == [
+        OneTestEvent(test_param="1"),
+        AnotherTestEvent(),
+        OneTestEvent(test_param="2"),
+    ]
+    # the extra event stays buffered for the next collection
+    assert ctx.collect_events(OneTestEvent(), [AnotherTestEvent], "step") == [
+        AnotherTestEvent()
+    ]
+
+
+def test_send_event_to_step(ctx, events):
+    OneTestEvent, AnotherTestEvent = events
+    ctx._queues["middle_step"] = asyncio.Queue()
+
+    ctx.send_event(OneTestEvent(), step="middle_step")
+    assert ctx._queues["middle_step"].get_nowait() == OneTestEvent()
+
+    with pytest.raises(WorkflowRuntimeError, match="does not exist"):
+        ctx.send_event(OneTestEvent(), step="missing_step")
+    with pytest.raises(WorkflowRuntimeError, match="does not accept event"):
+        ctx.send_event(AnotherTestEvent(), step="middle_step")
+    assert ctx._queues["middle_step"].empty()
+
+
+@pytest.mark.asyncio
+async def test_subscribers_reset_on_start(workflow, events):
+    OneTestEvent, _ = events
+    ctx = Context(workflow)
+    # no queue exists yet, the event goes nowhere
+    ctx.send_event(OneTestEvent())
+    assert ctx._get_subscribers(OneTestEvent) == []
+
+    workflow._start(ctx=ctx)
+    try:
+        assert ctx._get_subscribers(OneTestEvent) == [ctx._queues["middle_step"]]
+    finally:
+        await ctx.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_subscribers_reset_on_wait_for_event(ctx, events):
+    OneTestEvent, AnotherTestEvent = events
+    ctx.send_event(AnotherTestEvent())
+    assert ctx._get_subscribers(AnotherTestEvent) == []
+
+    waiter = asyncio.create_task(
+        ctx.wait_for_event(AnotherTestEvent, waiter_id="waiter", timeout=1)
+    )
+    await asyncio.sleep(0)
+    # the waiter only subscribes to the event type it's waiting for
+    assert ctx._get_subscribers(OneTestEvent) == []
+    ctx.send_event(AnotherTestEvent(another_test_param="reply"))
+
+    assert (await waiter).another_test_param == "reply"
+
+
+@pytest.mark.asyncio
+async def test_restored_waiter_queue(workflow, events):
+    OneTestEvent, AnotherTestEvent = events
+    ctx = Context(workflow)
+    ctx._queues["waiter"] = asyncio.Queue()
+    ctx._waiter_event_types["waiter"] = AnotherTestEvent
+
+    new_ctx = Context.from_dict(workflow, ctx.to_dict())
+    # the waited type isn't serialized, the queue receives every event until a waiter
+    # resumes, which skips the events of other types
+    assert new_ctx._waiter_event_types == {}
+    new_ctx.send_event(OneTestEvent())
+    new_ctx.send_event(AnotherTestEvent(another_test_param="reply"))
+    assert new_ctx._queues["waiter"].qsize() == 2
+
+    event = await new_ctx.wait_for_event(
+        AnotherTestEvent, waiter_id="waiter", timeout=1
+    )
+    assert event.another_test_param == "reply"
+
+
+async def _hold(lock: asyncio.Lock, release: asyncio.Event) -> None:
+    async with lock:
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_lock_only_guards_globals(ctx, events):
+    OneTestEvent, _ = events
+    await ctx.set("foo", "bar")
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(ctx.lock, release))
+    await asyncio.sleep(0)
+    assert ctx.lock.locked()
+
+    try:
+        assert await asyncio.wait_for(ctx.get("foo"), timeout=1) == "bar"
+        ev = OneTestEvent()
+        await asyncio.wait_for(ctx.mark_in_progress("middle_step", ev), timeout=1)
+        await asyncio.wait_for(
+            ctx.remove_from_in_progress("middle_step", ev), timeout=1
+        )
+        await asyncio.wait_for(ctx.add_running_step("middle_step"), timeout=1)
+        await asyncio.wait_for(ctx.remove_running_step("middle_step"), timeout=1)
+        assert await asyncio.wait_for(ctx.running_steps(), timeout=1) == []
+    finally:
+        release.set()
+        await holder
+
+
+def test_get_sync_set_sync(ctx):
+    ctx.set_sync("foo", "bar")
+    assert ctx.get_sync("foo") == "bar"
+    assert ctx.get_sync("missing", default=None) is None
+    with pytest.raises(ValueError, match="not found"):
+        ctx.get_sync("missing")
+
+
+@pytest.mark.asyncio
+async def test_set_sync_ignores_lock(ctx):
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(ctx.lock, release))
+    await asyncio.sleep(0)
+
+    try:
+        ctx.set_sync("foo", "sync")
+        assert ctx.get_sync("foo") == "sync"
+        # `set` waits for the lock to be released
+        setter = asyncio.create_task(ctx.set("foo", "async"))
+        await asyncio.sleep(0)
+        assert not setter.done()
+        assert ctx.get_sync("foo") == "sync"
+    finally:
+        release.set()
+        await holder
+
+    await setter
+    assert ctx.get_sync("foo") == "async"
+
+
+@pytest.mark.asyncio
+async def test_get_in_progress_snapshot(ctx, events):
+    OneTestEvent, AnotherTestEvent = events
+    first, second = OneTestEvent(test_param="1"), OneTestEvent(test_param="2")
+    await ctx.mark_in_progress("middle_step", first)
+    await ctx.mark_in_progress("middle_step", second)
+    other = AnotherTestEvent()
+    await ctx.mark_in_progress("end_step", other)
+
+    snapshot = ctx.get_in_progress_snapshot()
+    assert snapshot == {
+        "middle_step": [first, second],
+        "end_step": [other],
+    }
+
+    await ctx.remove_from_in_progress("middle_step", first)
+    await ctx.remove_from_in_progress("end_step", other)
+    # a copy was returned
+    assert snapshot["middle_step"] == [first, second]
+    # steps with nothing left in progress are left out
+    assert ctx.get_in_progress_snapshot() == {"middle_step": [second]}
+
+
+class SyncStreamingWorkflow(Workflow):
+    @step
+    def start_step(self, ctx: Context, ev: StartEvent) -> StopEvent:
+        # sync steps run in an executor thread, where no event loop is set
+        ctx.write_event_to_stream(StartEvent(msg="from thread"))
+        return StopEvent(result="done")
+
+
+@pytest.mark.asyncio
+async def test_write_event_to_stream_from_sync_step():
+    handler = SyncStreamingWorkflow().run()
+    # don't stream until the end, so the step is the first to write to the stream
+    assert await handler == "done"
+
+    streamed = [ev async for ev in handler.stream_events()]
+    assert streamed[0].msg == "from thread"
+    assert isinstance(streamed[-1], StopEvent)
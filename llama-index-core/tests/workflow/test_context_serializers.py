@@ -0,0 +1,81 @@
+import datetime
+import math
+import uuid
+from dataclasses import dataclass
+from enum import Enum
+
+import pytest
+from llama_index.core.workflow.context_serializers import (
+    JsonPickleSerializer,
+    JsonSerializer,
+    PickleSerializer,
+)
+
+
+class Color(Enum):
+    RED = "red"
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+JSON_VALUES = [
+    2**70,
+    -(2**70),
+    1.5,
+    {"nested": [1, "two", None, True]},
+]
+
+NON_JSON_VALUES = [
+    uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    Color.RED,
+    Point(x=1, y=2),
+    datetime.datetime(2024, 1, 2, 3, 4, 5),
+    datetime.date(2024, 1, 2),
+]
+
+
+@pytest.mark.parametrize("serializer", [JsonSerializer(), JsonPickleSerializer()])
+@pytest.mark.parametrize("value", JSON_VALUES)
+def test_json_round_trip(serializer, value):
+    restored = serializer.deserialize(serializer.serialize(value))
+    assert restored == value
+    assert type(restored) is type(value)
+    assert serializer.deserialize_many(serializer.serialize_many([value])) == [value]
+
+
+@pytest.mark.parametrize("serializer", [JsonSerializer(), JsonPickleSerializer()])
+def test_json_round_trip_non_finite_floats(serializer):
+    values = [math.inf, -math.inf, math.nan]
+
+    restored = serializer.deserialize_many(serializer.serialize_many(values))
+    assert restored[:2] == [math.inf, -math.inf]
+    assert math.isnan(restored[2])
+    assert math.isnan(serializer.deserialize(serializer.serialize(math.nan)))
+
+
+@pytest.mark.parametrize("value", NON_JSON_VALUES)
+def test_json_pickle_falls_back_to_pickle(value):
+    serializer = JsonPickleSerializer()
+
+    assert serializer.deserialize(serializer.serialize(value)) == value
+    assert serializer.deserialize_many(serializer.serialize_many([1, value])) == [
+        1,
+        value,
+    ]
+
+
+@pytest.mark.parametrize("value", NON_JSON_VALUES)
+def test_json_rejects_non_json_values(value):
+    with pytest.raises(ValueError):
+        JsonSerializer().serialize(value)
+
+
+def test_pickle_round_trip():
+    serializer = PickleSerializer()
+    values = [*JSON_VALUES, *NON_JSON_VALUES]
+
+    assert serializer.deserialize_many(serializer.serialize_many(values)) == values